@@ -1,8 +1,156 @@
 from flask import Flask, render_template, request, jsonify
+import functools
+import hashlib
+import io
+import os
 import re
 
 app = Flask(__name__)
 
+# templates are only re-read from disk while debugging
+_DEBUG = os.environ.get('FLASK_DEBUG', '') not in ('', '0')
+app.config['TEMPLATES_AUTO_RELOAD'] = _DEBUG
+
+# sql_to_drizzle_advanced is lru_cached on the raw text, so bound what can be a key
+_MAX_SQL_LEN = 1 << 20
+# JSON may spend 12 bytes on one char (a \uXXXX\uXXXX surrogate pair)
+app.config['MAX_CONTENT_LENGTH'] = 12 * _MAX_SQL_LEN
+
+# ── pre-compiled patterns (sql_to_drizzle_advanced) ─────────────────────────────
+_RE_TABLE       = re.compile(r'CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?([A-Za-z_]\w*)', re.I)
+_RE_ON_DELETE   = re.compile(r'ON\s+DELETE\s+(CASCADE|SET\s+NULL|RESTRICT|NO\s+ACTION)', re.I)
+_RE_ON_UPDATE   = re.compile(r'ON\s+UPDATE\s+(CASCADE|SET\s+NULL|RESTRICT|NO\s+ACTION)', re.I)
+_RE_TPK         = re.compile(r'PRIMARY\s+KEY\s*\(([^)]+)\)', re.I)
+_RE_TFK         = re.compile(
+    r'FOREIGN\s+KEY\s*\(([^)]+)\)\s*REFERENCES\s+([A-Za-z_]\w*)\s*\(([^)]+)\)\s*(.*)$', re.I)
+_RE_ENUM        = re.compile(r'ENUM\s*\(([^)]*)\)', re.I)
+_RE_REF         = re.compile(r'REFERENCES\s+([A-Za-z_]\w*)\s*\(\s*([A-Za-z_]\w*)\s*\)\s*(.*)$', re.I)
+_RE_DEFAULT     = re.compile(
+    r"DEFAULT\s+(?:'(?P<STR>[^']*)'"
+    r'|"(?P<QSTR>[^"]*)"'
+    r'|(?P<NUM>[+-]?\d+(?:\.\d+)?)'
+    r'|(?P<BOOL>true|false)'
+    r'|(?P<NOW>CURRENT_TIMESTAMP\b(?:\(\d*\))?|now\(\s*\d*\s*\))'
+    r'|(?P<FN>[A-Za-z_]\w*\([^)]*\)))', re.I)
+_RE_TYPE        = re.compile(
+    r'(?P<INT>\b(?:BIGINT|SMALLINT|INTEGER|INT)\b)'
+    r'|(?P<VARCHAR>\bN?VARCHAR\b|\bN?CHAR\b)'
+    r'|(?P<TEXT>\b(?:TINY|MEDIUM|LONG)?TEXT\b)'
+    r'|(?P<DOUBLE>\b(?:DOUBLE|FLOAT|DECIMAL|NUMERIC)\b)'
+    r'|(?P<BOOLEAN>\bBOOLEAN\b|\bTINYINT\(1\))'
+    r'|(?P<TIMESTAMP>\b(?:DATETIME|TIMESTAMP|DATE)\b)', re.I)
+_RE_VARCHAR_LEN = re.compile(r'\((\d+)\)')
+_RE_PAREN       = re.compile(r'[()]')
+_RE_FLAGS       = re.compile(
+    r'(?P<NN>\bNOT\s+NULL\b)'
+    r'|(?P<PK>\bPRIMARY\s+KEY\b)'
+    r'|(?P<AI>\bAUTO_INCREMENT\b|\bGENERATED\s+(?:ALWAYS|BY\s+DEFAULT)\s+AS\s+IDENTITY\b)'
+    r'|(?P<OU>\bON\s+UPDATE\s+CURRENT_TIMESTAMP\b)', re.I)
+
+# _RE_FLAGS group number → column flag bit
+_FLAG_NN, _FLAG_PK, _FLAG_AI, _FLAG_OU = 1, 2, 4, 8
+_FLAG_BITS = (_FLAG_NN, _FLAG_PK, _FLAG_AI, _FLAG_OU)
+
+# _RE_DEFAULT BOOL literal → TS literal; 0/1 match NUM first and stay numeric
+_BOOL_MAP = {'true': 'true', 'false': 'false'}
+
+# column-chain fragments emitted by the Drizzle renderer
+_NN            = '.notNull()'
+_PK            = '.primaryKey()'
+_IDENT         = '.generatedAlwaysAsIdentity()'
+_DNOW          = '.defaultNow()'
+_DNOW_SQL      = '.default(sql`now()`)'    # non-timestamp columns lack .defaultNow()
+_ON_UPDATE_NOW = '.$onUpdate(() => sql`CURRENT_TIMESTAMP`)'
+
+# _RE_TYPE group → (ts_type, raw_type)
+_TYPE_KINDS = {
+    'INT':       ('integer', 'INT'),
+    'VARCHAR':   ('varchar', 'VARCHAR'),
+    'TEXT':      ('text', 'TEXT'),
+    'DOUBLE':    ('double', 'DOUBLE'),
+    'BOOLEAN':   ('boolean', 'BOOLEAN'),
+    'TIMESTAMP': ('timestamp', 'TIMESTAMP'),
+}
+
+
+class _Col:
+    """Parsed column of a CREATE TABLE, as filled in by sql_to_drizzle_advanced."""
+    __slots__ = ('name', 'ts_type', 'length', 'not_null', 'default', 'default_now',
+                 'primary', 'identity', 'enum_name', 'references', 'raw_type')
+
+    def __init__(self, name: str, not_null: bool = False, primary: bool = False,
+                 identity: bool = False):
+        self.name = name
+        self.ts_type = ''
+        self.length = None
+        self.not_null = not_null
+        self.default = None
+        self.default_now = False
+        self.primary = primary
+        self.identity = identity
+        self.enum_name = None
+        self.references = None
+        self.raw_type = ''
+
+
+def _split_top_level(s: str) -> list[str]:
+    """Split on commas that sit outside parentheses and quotes (single pass)."""
+    out, depth, start = [], 0, 0
+    in_squote = in_dquote = escaped = False
+    for i, ch in enumerate(s):
+        if escaped:                    # char after '\' inside a quote is literal
+            escaped = False
+        elif (in_squote or in_dquote) and ch == '\\':
+            escaped = True
+        elif in_squote:
+            in_squote = ch != "'"
+        elif in_dquote:
+            in_dquote = ch != '"'
+        elif ch == "'": in_squote = True
+        elif ch == '"': in_dquote = True
+        elif ch == '(': depth += 1
+        elif ch == ')': depth -= 1
+        elif ch == ',' and depth == 0:
+            out.append(s[start:i])
+            start = i + 1
+    out.append(s[start:])
+    return [x.strip() for x in out if x.strip()]
+
+
+def _split_enum_values(s: str) -> list[str]:
+    """Split an ENUM value list; plain str.split unless a quoted value holds a comma."""
+    parts = [p.strip() for p in s.split(',')]
+    if all(len(p) >= 2 and p[0] == p[-1] and p[0] in '\'"' for p in parts):
+        return parts
+    return _split_top_level(s)
+
+
+def _match_paren(s: str, open_idx: int) -> int:
+    """Index of the ')' closing the '(' at open_idx, or -1 if unbalanced."""
+    depth = 0
+    for m in _RE_PAREN.finditer(s, open_idx):
+        if m[0] == '(':
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return m.start()
+    return -1
+
+
+def _parse_actions(tail: str) -> tuple[str | None, str | None]:
+    """Extract the (onDelete, onUpdate) referential actions from an FK tail."""
+    od = ou = None
+    m = _RE_ON_DELETE.search(tail)
+    if m: od = m.group(1).lower().replace(' ', '') or None
+    m = _RE_ON_UPDATE.search(tail)
+    if m: ou = m.group(1).lower().replace(' ', '') or None
+    if od == 'noaction': od = 'no action'
+    if ou == 'noaction': ou = 'no action'
+    return od, ou
+
+
+@functools.lru_cache(maxsize=256)
 def sql_to_drizzle_advanced(sql_text: str) -> tuple[str, str]:
     """
     1. Generates Drizzle ORM (pg-core) TypeScript for a single CREATE TABLE.
@@ -16,66 +164,45 @@ def sql_to_drizzle_advanced(sql_text: str) -> tuple[str, str]:
 
     # ── normalise ───────────────────────────────────────────────────────────────
     sql_text = (sql_text or '').strip()
-    sql_text = re.sub(r'`', '', sql_text)          # drop MySQL back-ticks
-    sql_text = re.sub(r'\s+', ' ', sql_text)       # squeeze whitespace
+    if '`' in sql_text:                                  # drop MySQL back-ticks
+        sql_text = sql_text.replace('`', '')
+    if '  ' in sql_text or not sql_text.isprintable():   # squeeze whitespace
+        sql_text = ' '.join(sql_text.split())
 
     # ── table name ─────────────────────────────────────────────────────────────
-    m_table = re.search(
-        r'CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?([A-Za-z_]\w*)',
-        sql_text, re.IGNORECASE)
+    m_table = _RE_TABLE.search(sql_text)
     table_name = m_table.group(1) if m_table else 'unknown'
 
     # ── isolate (…) block ───────────────────────────────────────────────────────
     open_idx = sql_text.find('(')
     if open_idx == -1:
         return f'// Failed to parse table {table_name}', ''
-    depth = 0
-    close_idx = -1
-    for i, ch in enumerate(sql_text[open_idx:], start=open_idx):
-        if ch == '(': depth += 1
-        elif ch == ')':
-            depth -= 1
-            if depth == 0:
-                close_idx = i
-                break
+    close_idx = _match_paren(sql_text, open_idx)
     if close_idx == -1:
         return f'// Incomplete column block for {table_name}', ''
 
     inner = sql_text[open_idx + 1:close_idx].strip()
-    items = [s.strip() for s in re.split(r',(?![^()]*\))', inner) if s.strip()]
+    items = _split_top_level(inner)
 
     # ── working structures ─────────────────────────────────────────────────────
-    columns: dict[str, dict] = {}
+    columns: dict[str, _Col] = {}
+    column_list: list[_Col] = []     # render order; dict is for name lookups
     enums, table_pk, table_fks = [], [], []
     triggers_needed, upd_cols = False, []
 
-    def parse_actions(tail: str):
-        od = ou = None
-        m = re.search(r'ON\s+DELETE\s+(CASCADE|SET\s+NULL|RESTRICT|NO\s+ACTION)', tail, re.I)
-        if m: od = m.group(1).lower().replace(' ', '') or None
-        m = re.search(r'ON\s+UPDATE\s+(CASCADE|SET\s+NULL|RESTRICT|NO\s+ACTION)', tail, re.I)
-        if m: ou = m.group(1).lower().replace(' ', '') or None
-        if od == 'noaction': od = 'no action'
-        if ou == 'noaction': ou = 'no action'
-        return od, ou
-
     # ── pass 1: parse each line ─────────────────────────────────────────────────
     for raw in items:
-        upper = raw.upper()
-
         # table-level PK
-        if (m := re.match(r'PRIMARY\s+KEY\s*\(([^)]+)\)', upper, re.I)):
+        if (m := _RE_TPK.match(raw)):
             table_pk = [c.strip() for c in m.group(1).split(',')]
             continue
 
         # table-level FK
-        m = re.match(
-            r'FOREIGN\s+KEY\s*\(([^)]+)\)\s*REFERENCES\s+([A-Za-z_]\w*)\s*\(([^)]+)\)\s*(.*)$',
-            raw, re.I)
+        m = _RE_TFK.match(raw)
         if m:
             cols = [c.strip() for c in m[1].split(',')]
             ref_table, ref_cols = m[2], [c.strip() for c in m[3].split(',')]
-            od, ou = parse_actions(m[4])
+            od, ou = _parse_actions(m[4])
             table_fks.append({'cols': cols, 'ref_table': ref_table,
                               'ref_cols': ref_cols, 'onDelete': od, 'onUpdate': ou})
             continue
@@ -83,80 +210,58 @@ def sql_to_drizzle_advanced(sql_text: str) -> tuple[str, str]:
         # column line
         name, *rest_parts = raw.split(None, 1)
         rest = rest_parts[0] if rest_parts else ''
-        rest_up = rest.upper()
-        col = {
-            'name': name,
-            'ts_type': '',
-            'length': None,
-            'not_null': 'NOT NULL' in rest_up,
-            'default': None,
-            'primary': 'PRIMARY KEY' in rest_up,
-            'identity': any(tok in rest_up for tok in
-                            ('AUTO_INCREMENT', 'GENERATED ALWAYS AS IDENTITY',
-                             'GENERATED BY DEFAULT AS IDENTITY')),
-            'enum_name': None,
-            'references': None,
-            'raw_type': '',
-        }
+        flags = 0
+        for m in _RE_FLAGS.finditer(rest):
+            flags |= _FLAG_BITS[m.lastindex - 1]
+        name_lower = name.lower()
+        col = _Col(name, not_null=bool(flags & _FLAG_NN),
+                   primary=bool(flags & _FLAG_PK), identity=bool(flags & _FLAG_AI))
 
         # ENUM → generate pgEnum & mark type
-        if (m := re.search(r'ENUM\s*\(([^)]*)\)', rest, re.I)):
-            vals = [v.strip().strip("'").strip('"') for v in
-                    re.split(r',(?![^()]*\))', m[1]) if v.strip()]
+        if (m := _RE_ENUM.search(rest)):
+            vals = [v.strip("'").strip('"') for v in _split_enum_values(m[1])]
             enum_name = f'{name}Enum'
             enums.append(f"export const {enum_name} = pgEnum('{name}', {vals});")
-            col.update(ts_type='enum', enum_name=enum_name, raw_type='ENUM')
+            col.ts_type, col.enum_name, col.raw_type = 'enum', enum_name, 'ENUM'
 
         # REFERENCES
-        if (m := re.search(r'REFERENCES\s+([A-Za-z_]\w*)\s*\(\s*([A-Za-z_]\w*)\s*\)\s*(.*)$',
-                           rest, re.I)):
-            od, ou = parse_actions(m[3])
-            col['references'] = {'table': m[1], 'column': m[2],
-                                 'onDelete': od, 'onUpdate': ou}
+        if (m := _RE_REF.search(rest)):
+            od, ou = _parse_actions(m[3])
+            col.references = {'table': m[1], 'column': m[2],
+                              'onDelete': od, 'onUpdate': ou}
 
         # DEFAULT literal/function
-        for pat, conv in [
-            (r"DEFAULT\s+'([^']*)'", lambda g: f'"{g}"'),
-            (r'DEFAULT\s+"([^"]*)"', lambda g: f'"{g}"'),
-            (r'DEFAULT\s+([+-]?\d+(?:\.\d+)?)', lambda g: g),
-            (r'DEFAULT\s+(true|false|TRUE|FALSE|0|1)', lambda g:
-                'true' if g.lower() in ('1', 'true') else 'false'),
-            (r'DEFAULT\s+([A-Za-z_]\w*\([^)]*\))', lambda g: g),
-        ]:
-            if (m := re.search(pat, rest, re.I)):
-                col['default'] = conv(m[1])
-                break
+        if (m := _RE_DEFAULT.search(rest)):
+            kind, val = m.lastgroup, m[m.lastgroup]
+            if kind == 'NOW':
+                col.default_now = True
+            else:
+                col.default = (f'"{val}"' if kind in ('STR', 'QSTR') else
+                               _BOOL_MAP[val.lower()] if kind == 'BOOL' else val)
 
         # AUDIT columns: force timestamp
-        audit = name.lower() in ('created_at', 'updated_at', 'deleted_at')
+        audit = name_lower in ('created_at', 'updated_at', 'deleted_at')
         if audit:
-            col['ts_type'] = 'timestamp'
-            if name.lower() == 'updated_at' and 'ON UPDATE CURRENT_TIMESTAMP' in rest_up:
+            col.ts_type = 'timestamp'
+            if name_lower == 'updated_at' and flags & _FLAG_OU:
                 triggers_needed, upd_cols = True, ['updated_at']
 
         # explicit type mapping if not yet decided
-        if not col['ts_type'] and col['raw_type'] != 'ENUM':
-            tmap = [('integer', r'\b(BIGINT|SMALLINT|INT|INTEGER)\b', 'INT'),
-                    ('varchar', r'(VARCHAR|CHAR)\b', 'VARCHAR'),
-                    ('text', r'(LONGTEXT|TEXT)\b', 'TEXT'),
-                    ('double', r'(DOUBLE|FLOAT|DECIMAL|NUMERIC)\b', 'DOUBLE'),
-                    ('boolean', r'BOOLEAN|TINYINT\(1\)', 'BOOLEAN'),
-                    ('timestamp', r'(DATETIME|TIMESTAMP|DATE)\b', 'TIMESTAMP')]
-            for t, pat, raw_t in tmap:
-                if re.search(pat, rest_up):
-                    col['ts_type'], col['raw_type'] = t, raw_t
-                    if t == 'varchar' and (m := re.search(r'\((\d+)\)', rest)):
-                        col['length'] = int(m[1])
-                    break
+        if not col.ts_type and col.raw_type != 'ENUM':
+            if (m := _RE_TYPE.search(rest)):
+                col.ts_type, col.raw_type = _TYPE_KINDS[m.lastgroup]
+                if m.lastgroup == 'VARCHAR' and (m := _RE_VARCHAR_LEN.search(rest)):
+                    col.length = int(m[1])
         # inference rules
-        if col['identity']:
-            col.update(ts_type='integer', primary=True)
-        if col['primary'] and not col['ts_type']:
-            col['ts_type'] = 'integer'
-        if not col['ts_type']:
-            col['ts_type'] = 'text'
+        if col.identity:
+            col.ts_type, col.primary = 'integer', True
+        if col.primary and not col.ts_type:
+            col.ts_type = 'integer'
+        if not col.ts_type:
+            col.ts_type = 'text'
 
         columns[name] = col
+        column_list.append(col)
 
     # ── pass 2: table-level PK inference ────────────────────────────────────────
     composite_pk = None
@@ -164,42 +269,50 @@ def sql_to_drizzle_advanced(sql_text: str) -> tuple[str, str]:
         if len(table_pk) == 1:
             pk = table_pk[0]
             if pk in columns:
-                columns[pk]['primary'] = True
-                if not columns[pk]['raw_type']:
-                    columns[pk].update(ts_type='varchar', length=200)
+                columns[pk].primary = True
+                if not columns[pk].raw_type:
+                    columns[pk].ts_type, columns[pk].length = 'varchar', 200
         else:
             composite_pk = [c for c in table_pk if c in columns]
             for pk in composite_pk:
-                if not columns[pk]['raw_type']:
-                    columns[pk].update(ts_type='varchar', length=200)
+                if not columns[pk].raw_type:
+                    columns[pk].ts_type, columns[pk].length = 'varchar', 200
 
     # ── render Drizzle TS ───────────────────────────────────────────────────────
-    out = [*enums, f'export const {table_name} = pgTable("{table_name}", {{']
-
-    def builder(c):
-        parts = [
-            f'  {c["name"]}: ',
-            f'{c["enum_name"]}("{c["name"]}")' if c['ts_type'] == 'enum' else
-            f'{c["ts_type"]}("{c["name"]}")' if c["ts_type"] != "varchar" else
-            f'varchar("{c["name"]}", {{ length: {c["length"] or 255} }})'
-        ]
-        if c['default'] is not None: parts.append(f'.default({c["default"]})')
-        if c['not_null']: parts.append('.notNull()')
-        if c['primary']:  parts.append('.primaryKey()')
-        if c['identity']: parts.append('.generatedAlwaysAsIdentity()')
-        if c['references']:
+    buf = io.StringIO()
+    w = buf.write
+    for e in enums:
+        w(e); w('\n')
+    w(f'export const {table_name} = pgTable("{table_name}", {{\n')
+
+    def builder(c, w):
+        name = c.name
+        w('  '); w(name); w(': ')
+        if c.ts_type == 'enum':
+            w(c.enum_name); w('("'); w(name); w('")')
+        elif c.ts_type == 'varchar':
+            w(f'varchar("{name}", {{ length: {c.length or 255} }})')
+        else:
+            w(c.ts_type); w('("'); w(name); w('")')
+        if c.default_now:
+            w(_DNOW if c.ts_type == 'timestamp' else _DNOW_SQL)
+        elif c.default is not None: w(f'.default({c.default})')
+        if c.not_null: w(_NN)
+        if c.primary:  w(_PK)
+        if c.identity: w(_IDENT)
+        if (ref := c.references):
             opts = []
-            if c['references']['onDelete']: opts.append(f"onDelete: '{c['references']['onDelete']}'")
-            if c['references']['onUpdate']: opts.append(f"onUpdate: '{c['references']['onUpdate']}'")
+            if ref['onDelete']: opts.append(f"onDelete: '{ref['onDelete']}'")
+            if ref['onUpdate']: opts.append(f"onUpdate: '{ref['onUpdate']}'")
             opt = f", {{ {', '.join(opts)} }}" if opts else ''
-            parts.append(f'.references(() => {c["references"]["table"]}.{c["references"]["column"]}{opt})')
-        if c['name'] == 'updated_at' and triggers_needed:
-            parts.append('.$onUpdate(() => sql`CURRENT_TIMESTAMP`)')
-        parts.append(',')
-        return ''.join(parts)
+            w(f'.references(() => {ref["table"]}.{ref["column"]}{opt})')
+        if name == 'updated_at' and triggers_needed:
+            w(_ON_UPDATE_NOW)
+        w(',\n')
 
-    out += [builder(col) for col in columns.values()]
-    out.append('}',)
+    for col in column_list:
+        builder(col, w)
+    w('}\n')
 
     # table-level composite PK / FKs
     builders = []
@@ -207,8 +320,8 @@ def sql_to_drizzle_advanced(sql_text: str) -> tuple[str, str]:
         cols = ', '.join(f'table.{c}' for c in composite_pk)
         builders.append(f'pk: primaryKey({cols})')
     for fk in table_fks:
-        if len(fk['cols']) == 1 and not columns[fk['cols'][0]].get('references'):
-            columns[fk['cols'][0]]['references'] = {
+        if len(fk['cols']) == 1 and not columns[fk['cols'][0]].references:
+            columns[fk['cols'][0]].references = {
                 'table': fk['ref_table'], 'column': fk['ref_cols'][0],
                 'onDelete': fk['onDelete'], 'onUpdate': fk['onUpdate']}
         else:
@@ -223,11 +336,12 @@ def sql_to_drizzle_advanced(sql_text: str) -> tuple[str, str]:
                 f"foreignKey({{ columns: [{cols}], foreignColumns: [{refs}] }}{opt})"
             )
     if builders:
-        out.append(', (table) => ({')
-        out += [f'  {b},' for b in builders]
-        out.append('})')
-    out.append(');')
-    drizzle_ts = '\n'.join(out)
+        w(', (table) => ({\n')
+        for b in builders:
+            w('  '); w(b); w(',\n')
+        w('})\n')
+    w(');')
+    drizzle_ts = buf.getvalue()
 
     # ── trigger DDL, if required ───────────────────────────────────────────────
     trigger_sql = ''
@@ -262,15 +376,8 @@ def mysql_to_postgres_advanced(sql_text: str) -> str:
     s = re.sub(r'`', '', s)
 
     # cut MySQL tail (ENGINE…)
-    if (start := s.find('(')) != -1:
-        depth = 0
-        for i, ch in enumerate(s[start:], start):
-            if ch == '(': depth += 1
-            elif ch == ')':
-                depth -= 1
-                if depth == 0:
-                    s = s[:i+1]
-                    break
+    if (start := s.find('(')) != -1 and (end := _match_paren(s, start)) != -1:
+        s = s[:end + 1]
     # global cleans
     patterns = [r'\)\s*ENGINE\s*=\s*\w+.*?;?', r'DEFAULT\s+CHARSET\s*=\s*\w+',
                 r'CHARSET\s*=\s*\w+', r'COLLATE\s*=\s*[\w_]+',
@@ -314,29 +421,67 @@ def mysql_to_postgres_advanced(sql_text: str) -> str:
     body = ',\n  '.join(map_line(x) for x in items)
     return f'CREATE TABLE "{table}" (\n  {body}\n);'
 
-@app.route("/api/drizzle", methods=["POST"])
+# any edit to this file may change converter output, so it versions every ETag
+with open(__file__, 'rb') as _f:
+    _CONVERTER_VERSION = hashlib.sha1(_f.read()).hexdigest()
+
+
+def _sql_etag(sql: str) -> str:
+    """ETag for a conversion result: converter version, endpoint and SQL text."""
+    return hashlib.sha1(f'{_CONVERTER_VERSION}\0{request.path}\0{sql}'.encode()).hexdigest()
+
+
+def _not_modified(etag: str) -> bool:
+    """True only if If-None-Match lists etag itself; a bare '*' never matches."""
+    return etag in request.if_none_match.as_set()
+
+
+def _etagged(payload: dict, etag: str):
+    resp = jsonify(payload)
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'private, max-age=3600'
+    return resp
+
+
+@app.errorhandler(413)
+def too_large(e):
+    return jsonify({ "ok": False, "error": "input too large" }), 413
+
+
+@app.post("/api/drizzle")
 def api_drizzle():
     data = request.get_json(silent=True) or {}
     sql = data.get("sql", "")
     try:
+        # strip first so whitespace-only variants share a cache entry
+        sql = (sql or '').strip()
+        if len(sql) > _MAX_SQL_LEN:
+            return jsonify({ "ok": False, "error": "input too large" }), 413
+        etag = _sql_etag(sql)
+        if _not_modified(etag):
+            return '', 304
         code = sql_to_drizzle_advanced(sql)
-        return jsonify({ "ok": True, "code": code })
+        return _etagged({ "ok": True, "code": code }, etag)
     except Exception as e:
         return jsonify({ "ok": False, "error": str(e) }), 400
 
-@app.route("/api/postgres", methods=["POST"])
+@app.post("/api/postgres")
 def api_postgres():
     data = request.get_json(silent=True) or {}
     sql = data.get("sql", "")
     try:
+        sql = (sql or '').strip()
+        etag = _sql_etag(sql)
+        if _not_modified(etag):
+            return '', 304
         code = mysql_to_postgres_advanced(sql)
-        return jsonify({ "ok": True, "sql": code })
+        return _etagged({ "ok": True, "sql": code }, etag)
     except Exception as e:
         return jsonify({ "ok": False, "error": str(e) }), 400
-@app.route("/", methods=["GET"])
+@app.get("/")
 def index():
     return render_template("index.html")
 
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    app.run(debug=_DEBUG)
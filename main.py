@@ -1,24 +1,116 @@
 from flask import Flask, render_template, request, jsonify
+from flask.json.provider import JSONProvider
+from types import MappingProxyType
+from typing import Mapping
+import functools
+import io
+import os
 import re
 
+try:
+    import orjson
+except ImportError:  # fall back to Flask's stdlib json provider
+    orjson = None
+
 app = Flask(__name__)
 
+
+class ORJSONProvider(JSONProvider):
+    """Serve jsonify() and request.get_json() through orjson."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+if orjson is not None:
+    app.json = ORJSONProvider(app)
+
+# ── pre-compiled patterns (convert_mysql) ─────────────────────
+_RE_CHARSET     = re.compile(r'CHARACTER SET \w+ COLLATE \w+', re.I)
+_RE_HAS_TABLE   = re.compile(r'CREATE\s+TABLE', re.I)
+_RE_TABLE       = re.compile(r'CREATE TABLE (?:IF NOT EXISTS )?([A-Za-z_]\w*)', re.I)
+_RE_ENUM        = re.compile(r'(\w+)\s+enum\s*\(([^)]*)\)', re.I)
+_RE_DEFAULT     = re.compile(
+    r"DEFAULT\s+(?:'(?P<sq>[^']*)'"
+    r'|"(?P<dq>[^"]*)"'
+    r'|(?P<num>[+-]?\d+(?:\.\d+)?)'
+    r'|(?P<bool>true|false))', re.I)
+_RE_VARCHAR_LEN = re.compile(r'\((\d+)\)')
+# exactly the strings float() accepts (PEP 515 underscores included); such
+# quoted DEFAULT values are emitted bare
+_RE_NUMERIC     = re.compile(
+    r'\s*[+-]?(?:(?:\d(?:_?\d)*(?:\.(?:\d(?:_?\d)*)?)?|\.\d(?:_?\d)*)(?:e[+-]?\d(?:_?\d)*)?'
+    r'|inf(?:inity)?|nan)\s*', re.I)
+
+# _kind: upper-cased base type (text before '(') → (kind, length)
+_TYPE_MAP = {
+    **dict.fromkeys(('DOUBLE', 'NUMERIC', 'DECIMAL', 'FLOAT'), ('numeric', None)),
+    **dict.fromkeys(('INT', 'INTEGER', 'SMALLINT', 'MEDIUMINT', 'BIGINT'), ('integer', None)),
+    **dict.fromkeys(('TEXT', 'TINYTEXT', 'MEDIUMTEXT', 'LONGTEXT'), ('text', None)),
+    **dict.fromkeys(('TIMESTAMP', 'DATETIME', 'DATE'), ('timestamp', None)),
+    'CHAR': ('varchar', 1),
+}
+
+# keeps updated_at fresh in-database; formatted with the table name
+_TRIGGER_TEMPLATE = """\
+CREATE OR REPLACE FUNCTION set_updated_at_{tbl}() RETURNS trigger AS $$
+BEGIN
+  NEW.updated_at := CURRENT_TIMESTAMP;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER {tbl}_set_updated_at
+BEFORE UPDATE ON "{tbl}"
+FOR EACH ROW EXECUTE FUNCTION set_updated_at_{tbl}();"""
+
+_MAX_SQL_LEN = 1 << 20      # refuse inputs over 1M chars outright
+# JSON may spend 12 bytes on one char (a \uXXXX\uXXXX surrogate pair)
+app.config['MAX_CONTENT_LENGTH'] = 12 * _MAX_SQL_LEN
+
+_AUDIT_COLS = frozenset({'created_at', 'updated_at', 'deleted_at'})
+_BOOL_MAP   = {'0': 'false', '1': 'true', 'true': 'true', 'false': 'false'}
+
+class _Col:
+    """One parsed column of the CREATE TABLE handled by convert_mysql."""
+    __slots__ = ('name', 'kind', 'nn', 'default', 'vals', 'length', 'created', 'on_upd')
+
+    def __init__(self, name: str, kind: str, nn: bool, default: str | None,
+                 vals: list[str] | None = None, length: int | None = None,
+                 created: bool = False, on_upd: bool = False):
+        self.name = name
+        self.kind = kind
+        self.nn = nn
+        self.default = default
+        self.vals = vals
+        self.length = length
+        self.created = created
+        self.on_upd = on_upd
+
+
 # ─────────────────────────────────────────────────────────────
 #  Helper: convert a single MySQL CREATE TABLE
 #  Returns {'drizzle': “…TypeScript…”, 'pgsql': “…raw SQL…”}
+#  Results are memoised, so the mapping is read-only.
 # ─────────────────────────────────────────────────────────────
-def convert_mysql(sql: str) -> dict[str, str]:
+@functools.lru_cache(maxsize=256)
+def convert_mysql(sql: str) -> Mapping[str, str]:
     # Clean input SQL
     sql_clean = (sql or '').strip()
-    sql_clean = re.sub(r'`', '', sql_clean)
+    if not _RE_HAS_TABLE.search(sql_clean):
+        return MappingProxyType({"drizzle": "// failed to parse", "pgsql": sql_clean})
+    sql_clean = sql_clean.replace('`', '')
     # Remove CHARACTER SET / COLLATE
-    sql_clean = re.sub(r'CHARACTER SET \w+ COLLATE \w+', '', sql_clean, flags=re.I)
-    sql_clean = re.sub(r'\s+', ' ', sql_clean)
+    sql_clean = _RE_CHARSET.sub('', sql_clean)
+    sql_clean = ' '.join(sql_clean.split())
 
     # table name
-    m_table = re.search(r'CREATE TABLE (?:IF NOT EXISTS )?([A-Za-z_]\w*)', sql_clean, re.I)
+    m_table = _RE_TABLE.search(sql_clean)
     if not m_table:
-        return {"drizzle": "// failed to parse", "pgsql": sql_clean}
+        return MappingProxyType({"drizzle": "// failed to parse", "pgsql": sql_clean})
     tbl = m_table.group(1)
 
     # column / constraint list
@@ -31,10 +123,10 @@ def convert_mysql(sql: str) -> dict[str, str]:
             end = i
             break
     if end == -1:
-        return {"drizzle": "// incomplete SQL", "pgsql": sql_clean}
+        return MappingProxyType({"drizzle": "// incomplete SQL", "pgsql": sql_clean})
 
     # split top-level columns/constraints
-    items = [s.strip() for s in re.split(r',(?![^()]*\))', sql_clean[start + 1:end]) if s.strip()]
+    items = _split_top(sql_clean[start + 1:end])
 
     enums: dict[str, list[str]] = {}
     cols, need_trigger = [], False
@@ -42,11 +134,10 @@ def convert_mysql(sql: str) -> dict[str, str]:
     # ── pass 1: parse each line ───────────────────────────────
     for raw in items:
         # ENUM
-        if (m := re.match(r'(\w+)\s+enum\s*\(([^)]*)\)', raw, re.I)):
+        if (m := _RE_ENUM.match(raw)):
             name, vals = m[1], [v.strip().strip("'\"") for v in m[2].split(',')]
             enums[name] = vals
-            cols.append(dict(name=name, kind='enum', default=_def(raw), nn='NOT NULL' in raw.upper(),
-                             vals=vals, created=False, on_upd=False))
+            cols.append(_Col(name, 'enum', 'NOT NULL' in raw.upper(), _def(raw), vals=vals))
             continue
 
         parts = raw.split()
@@ -54,143 +145,155 @@ def convert_mysql(sql: str) -> dict[str, str]:
             continue
         name, sql_type = parts[0], parts[1]
         rest = raw[len(name) + len(sql_type):]
+        rest_up, name_lower = rest.upper(), name.lower()
 
-        nn      = 'NOT NULL' in rest.upper() or 'NOT NULL' in sql_type.upper()
+        nn      = 'NOT NULL' in rest_up
         default = _def(rest)
-        on_upd  = name.lower() == 'updated_at' and 'ON UPDATE CURRENT_TIMESTAMP' in rest.upper()
+        on_upd  = name_lower == 'updated_at' and 'ON UPDATE CURRENT_TIMESTAMP' in rest_up
         if on_upd: need_trigger = True
-        created  = name.lower() == 'created_at'
+        created  = name_lower == 'created_at'
 
-        kind, length = _kind(sql_type)
+        kind, length = _kind(sql_type.upper())
 
         # audit columns → timestamp
-        if name.lower() in ('created_at', 'updated_at', 'deleted_at'):
+        if name_lower in _AUDIT_COLS:
             kind = 'timestamp'
 
-        cols.append(dict(name=name, kind=kind, length=length, nn=nn,
-                         default=default, vals=None,
+        cols.append(_Col(name, kind, nn, default, length=length,
                          created=created, on_upd=on_upd))
 
-    # ── produce Drizzle code ────────────────────────────────
-    ts_lines = [f"export const {n}Enum = pgEnum('{n}', {v});" for n, v in enums.items()]
-    ts_lines.append(f'export const {tbl} = pgTable("{tbl}", {{')
-
-    for c in cols:
-        base = _drizzle_base(c)
-        chain = []
-        if c['created']:
-            chain.append('.defaultNow().notNull()')
-        elif c['default'] is not None:
-            chain.append(f'.default({c["default"]})')
-        if c['nn'] and not c['created']:
-            chain.append('.notNull()')
-        if c['on_upd']:
-            chain.append('.$onUpdate(() => sql`CURRENT_TIMESTAMP`)')
-        ts_lines.append(f"  {c['name']}: {base}{''.join(chain)},")
-    ts_lines.append('});')
-    drizzle_ts = '\n'.join(ts_lines)
-
-    # ── produce PostgreSQL DDL ──────────────────────────────
+    # ── produce Drizzle code + PostgreSQL DDL (one pass) ────
+    buf = io.StringIO()
+    w = buf.write
+    for n, v in enums.items():
+        w(f"export const {n}Enum = pgEnum('{n}', {v});\n")
+    w(f'export const {tbl} = pgTable("{tbl}", {{\n')
     pg_enum_sql = [f"CREATE TYPE {n} AS ENUM ({', '.join(repr(x) for x in v)});" for n, v in enums.items()]
-
     col_defs = []
+    cd_append = col_defs.append
+
     for c in cols:
-        typ = ('NUMERIC(11,2)' if c['kind'] == 'numeric' else
-               f"varchar({c['length']})" if c['kind'] == 'varchar' else
-               c['name'] if c['kind'] == 'enum' else
-               c['kind'].upper())
-        dflt = f" DEFAULT {c['default']}" if c['default'] else ''
-        nn   = ' NOT NULL' if c['nn'] else ''
-        col_defs.append(f"{c['name']} {typ}{dflt}{nn}")
+        name, kind, default, nn, created = c.name, c.kind, c.default, c.nn, c.created
+
+        w('  '); w(name); w(': '); w(_drizzle_base(c))
+        if created:
+            w('.defaultNow().notNull()')
+        else:
+            if default is not None: w(f'.default({default})')
+            if nn: w('.notNull()')
+        if c.on_upd:
+            w('.$onUpdate(() => sql`CURRENT_TIMESTAMP`)')
+        w(',\n')
+
+        typ = ('NUMERIC(11,2)' if kind == 'numeric' else
+               f"varchar({c.length})" if kind == 'varchar' else
+               name if kind == 'enum' else
+               kind.upper())
+        dflt = f" DEFAULT {default}" if default else ''
+        cd_append(f"{name} {typ}{dflt}{' NOT NULL' if nn else ''}")
+    w('});')
+    drizzle_ts = buf.getvalue()
 
     pg_table = f'CREATE TABLE "{tbl}" (\n  ' + ',\n  '.join(col_defs) + "\n);"
 
-    trigger_sql = ''
-    if need_trigger:
-        fn  = f"set_updated_at_{tbl}"
-        trg = f"{tbl}_set_updated_at"
-        trigger_sql = f"""
-CREATE OR REPLACE FUNCTION {fn}() RETURNS trigger AS $$
-BEGIN
-  NEW.updated_at := CURRENT_TIMESTAMP;
-  RETURN NEW;
-END;
-$$ LANGUAGE plpgsql;
-
-CREATE TRIGGER {trg}
-BEFORE UPDATE ON "{tbl}"
-FOR EACH ROW EXECUTE FUNCTION {fn}();
-""".strip()
+    trigger_sql = _TRIGGER_TEMPLATE.format(tbl=tbl) if need_trigger else ''
 
     pg_sql = '\n'.join(pg_enum_sql + [pg_table, trigger_sql]).strip()
 
-    return {'drizzle': drizzle_ts, 'pgsql': pg_sql}
+    return MappingProxyType({'drizzle': drizzle_ts, 'pgsql': pg_sql})
 
 
 # ── helpers ────────────────────────────────────────────────
-def _def(segment: str):
-    m = (re.search(r"DEFAULT\s+'([^']*)'", segment, re.I) or
-         re.search(r'DEFAULT\s+"([^"]*)"', segment, re.I) or
-         re.search(r'DEFAULT\s+([+-]?\d+(?:\.\d+)?)', segment, re.I) or
-         re.search(r'DEFAULT\s+(true|false|TRUE|FALSE|0|1)', segment, re.I))
+def _split_top(body: str) -> list[str]:
+    """Split on commas outside parentheses and quotes, in one linear pass."""
+    out, depth, start, quote, escaped = [], 0, 0, '', False
+    for i, ch in enumerate(body):
+        if quote:
+            if escaped: escaped = False          # char after '\' is literal
+            elif ch == '\\': escaped = True
+            elif ch == quote: quote = ''
+        elif ch in '\'"': quote = ch
+        elif ch == '(': depth += 1
+        elif ch == ')': depth -= 1
+        elif ch == ',' and depth == 0:
+            out.append(body[start:i])
+            start = i + 1
+    out.append(body[start:])
+    return [x.strip() for x in out if x.strip()]
+
+
+def _def(segment: str) -> str | None:
+    m = _RE_DEFAULT.search(segment)
     if not m: return None
-    val = m.group(1)
-    if val.lower() in ('true', 'false', '0', '1'):
-        return 'true' if val.lower() in ('1', 'true') else 'false'
-    try:
-        float(val)
-        return val
-    except:
+    kind, val = m.lastgroup, m[m.lastgroup]
+    if (b := _BOOL_MAP.get(val.lower())) is not None:
+        return b
+    if kind in ('sq', 'dq') and not _RE_NUMERIC.fullmatch(val):
         return f'"{val}"'
+    return val
 
 
-def _kind(sql_type: str):
-    sql_type = sql_type.upper()
-    if sql_type.startswith('DOUBLE'): return 'numeric', None
-    if sql_type.startswith(('NUMERIC', 'DECIMAL', 'FLOAT')): return 'numeric', None
-    if 'VARCHAR' in sql_type:
-        m = re.search(r'\((\d+)\)', sql_type)
+def _kind(sql_type: str) -> tuple[str, int | None]:
+    # sql_type arrives upper-cased from convert_mysql
+    base = sql_type.split('(', 1)[0]
+    if (res := _TYPE_MAP.get(base)) is not None:
+        return res
+    if base == 'VARCHAR':
+        m = _RE_VARCHAR_LEN.search(sql_type)
         return 'varchar', int(m.group(1)) if m else 255
-    if 'CHAR' in sql_type: return 'varchar', 1
-    if 'TINYINT(1)' in sql_type: return 'boolean', None
-    if 'INT' in sql_type: return 'integer', None
-    if 'BIGINT' in sql_type: return 'integer', None
-    if 'TEXT' in sql_type or 'LONGTEXT' in sql_type: return 'text', None
-    if any(x in sql_type for x in ('TIMESTAMP', 'DATETIME', 'DATE')): return 'timestamp', None
+    if base == 'TINYINT':
+        return ('boolean', None) if sql_type.startswith('TINYINT(1)') else ('integer', None)
+
+    # unusual spellings (INT4, NVARCHAR(n), TIMESTAMPTZ …): match on the prefix
+    if sql_type.startswith(('DOUBLE', 'NUMERIC', 'DECIMAL', 'FLOAT')): return 'numeric', None
+    if sql_type.startswith(('VARCHAR', 'NVARCHAR')):
+        m = _RE_VARCHAR_LEN.search(sql_type)
+        return 'varchar', int(m.group(1)) if m else 255
+    if sql_type.startswith(('CHAR', 'NCHAR')): return 'varchar', 1
+    if sql_type.startswith(('INT', 'TINYINT', 'SMALLINT', 'MEDIUMINT', 'BIGINT')): return 'integer', None
+    if sql_type.startswith(('TIMESTAMP', 'DATETIME', 'DATE')): return 'timestamp', None
     return 'text', None
 
 
-def _drizzle_base(c):
-    if c['kind'] == 'enum':
-        return f"{c['name']}Enum('{c['name']}')"
-    if c['kind'] == 'numeric':
-        return f"numeric('{c['name']}', {{ precision: 11, scale: 2 }})"
-    if c['kind'] == 'varchar':
-        return f"varchar('{c['name']}', {{ length: {c['length'] or 255} }})"
-    return f"{c['kind']}('{c['name']}')"
+def _drizzle_base(c: _Col) -> str:
+    if c.kind == 'enum':
+        return f"{c.name}Enum('{c.name}')"
+    if c.kind == 'numeric':
+        return f"numeric('{c.name}', {{ precision: 11, scale: 2 }})"
+    if c.kind == 'varchar':
+        return f"varchar('{c.name}', {{ length: {c.length or 255} }})"
+    return f"{c.kind}('{c.name}')"
 
 
 # ── Flask routes ─────────────────────────────────────────────
-@app.route("/api/drizzle", methods=["POST"])
-def api_drizzle():
+@app.errorhandler(413)
+def too_large(e):
+    return jsonify({"ok": False, "error": "input too large"}), 413
+
+
+def _handle(keys: tuple[str, ...]):
+    """Convert the posted SQL once and return the requested result keys."""
     data = request.get_json(silent=True) or {}
     sql = data.get("sql", "")
     try:
+        sql = (sql or '').strip()
+        # checked before the lru_cache so oversized inputs never become cache keys
+        if len(sql) > _MAX_SQL_LEN:
+            return jsonify({"ok": False, "error": "input too large"}), 413
         res = convert_mysql(sql)
-        return jsonify({"ok": True, "drizzle": res["drizzle"], "pgsql": res["pgsql"]})
+        return jsonify({"ok": True, **{k: res[k] for k in keys}})
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 400
 
 
+@app.route("/api/drizzle", methods=["POST"])
+def api_drizzle():
+    return _handle(("drizzle", "pgsql"))
+
+
 @app.route("/api/postgres", methods=["POST"])
 def api_postgres():
-    data = request.get_json(silent=True) or {}
-    sql = data.get("sql", "")
-    try:
-        res = convert_mysql(sql)
-        return jsonify({"ok": True, "pgsql": res["pgsql"]})
-    except Exception as e:
-        return jsonify({"ok": False, "error": str(e)}), 400
+    return _handle(("pgsql",))
 
 
 @app.route("/", methods=["GET"])
@@ -199,5 +302,6 @@ def index():
 
 
 
+# local development only; production runs wsgi:app under gunicorn
 if __name__ == "__main__":
-    app.run(debug=True)
+    app.run(debug=os.environ.get('FLASK_DEBUG', '') not in ('', '0'))
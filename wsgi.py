@@ -0,0 +1,7 @@
+"""WSGI entrypoint for production serving.
+
+    gunicorn -w "$(nproc)" -k gthread --threads 4 wsgi:app
+
+Each worker process keeps its own convert_mysql cache.
+"""
+from main import app